@@ -38,6 +38,7 @@ POST_SELECTION = {
     'max_age_hours': 24,  # Maximum age of posts to comment on (in hours)
     'max_comments': 500,  # Don't comment on posts with too many comments
     'skip_stickied': True,  # Skip pinned/stickied posts
+    'fetch_mode': 'combined',  # Options: combined (one r/a+b+c listing), per_subreddit
 }
 
 # Comment Behavior
@@ -48,6 +49,42 @@ COMMENT_BEHAVIOR = {
     'min_comment_length': 10,  # Minimum length for comments
 }
 
+# Comment History Sync
+# Rebuilds the already-commented list from the account's own recent comments
+COMMENT_HISTORY = {
+    'sync_on_start': True,  # Page through account comments made since the last sync before each run
+    'sync_overlap_seconds': 300,  # Re-read comments this far before the last sync to allow for clock skew
+}
+
+# Rejected Post Cache
+# Posts that fail the selection criteria are remembered so later runs skip them
+REJECTION_CACHE = {
+    'file': 'rejected_posts.json',
+    'recheck_hours': {  # How long a rejection is trusted before the post is checked again
+        'own_post': 168,
+        'too_old': 48,  # Never becomes young again; kept until it has left the listings
+        'too_many_comments': 24,  # Comment counts only grow
+        'stickied': 6,
+        'low_score': 1,  # Scores change quickly
+    },
+}
+
+# Adaptive Listing Size
+# The share of newly seen posts that pass the filters is tracked per subreddit and
+# used to size each per-subreddit listing request so the needed candidates usually
+# arrive in one page; a second page is requested when the first comes back short.
+# This covers 'per_subreddit' fetches and the top-up requests made in 'combined'
+# mode; the combined listing itself uses default_limit per subreddit.
+LISTING_SIZE = {
+    'file': 'subreddit_yield.json',
+    'default_limit': 25,  # Posts requested from a subreddit with no history
+    'min_limit': 5,  # Never request fewer posts than this
+    'max_limit': 100,  # Reddit returns at most 100 posts per page
+    'decay': 0.3,  # Weight of the latest run in the moving average (0-1)
+    'headroom': 1.5,  # Request this many times the expected number of posts needed
+    'max_combined_pages': 3,  # Cap on pages fetched for the combined r/a+b+c listing
+}
+
 # Rate Limiting (in seconds)
 RATE_LIMITS = {
     'min_delay': 30,  # Minimum delay between comments
@@ -55,6 +92,14 @@ RATE_LIMITS = {
     'subreddit_switch_delay': 60,  # Delay when switching to a new subreddit
 }
 
+# Network / HTTP Session Settings
+NETWORK = {
+    'pool_connections': 4,  # Number of host connection pools to keep
+    'pool_maxsize': 4,  # Maximum keep-alive connections per host
+    'max_retries': 0,  # Connection retries at the transport level (prawcore retries server errors itself)
+    'timeout': 16,  # Request timeout in seconds
+}
+
 # Logging Configuration
 LOGGING = {
     'level': 'INFO',  # DEBUG, INFO, WARNING, ERROR
@@ -19,6 +19,7 @@ import logging
 import os
 import sys
 import argparse
+import math
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from typing import List, Dict, Optional
@@ -27,8 +28,10 @@ import json
 # Import configuration
 from config import (
     TARGET_SUBREDDITS, COMMENT_TEMPLATES, POST_SELECTION, 
-    COMMENT_BEHAVIOR, RATE_LIMITS, LOGGING
+    COMMENT_BEHAVIOR, RATE_LIMITS, LOGGING, REJECTION_CACHE,
+    LISTING_SIZE, COMMENT_HISTORY
 )
+from reddit_session import RequestStats, create_reddit
 
 class RedditBot:
     def __init__(self, dry_run: bool = False):
@@ -36,8 +39,13 @@ class RedditBot:
         load_dotenv()
         self.dry_run = dry_run
         self.setup_logging()
+        self.request_stats = RequestStats()
         self.reddit = self.setup_reddit()
+        self.history_synced_utc = None
+        self.history_horizon_hours = None
         self.commented_posts = self.load_commented_posts()
+        self.rejected_posts = self.load_rejected_posts()
+        self.subreddit_yield = self.load_subreddit_yield()
         self.stats = {
             'comments_posted': 0,
             'posts_skipped': 0,
@@ -77,13 +85,7 @@ class RedditBot:
             
             self.logger.info("🔐 Attempting to connect to Reddit API...")
             
-            reddit = praw.Reddit(
-                client_id=required_vars['REDDIT_CLIENT_ID'],
-                client_secret=required_vars['REDDIT_CLIENT_SECRET'],
-                user_agent=required_vars['REDDIT_USER_AGENT'],
-                username=required_vars['REDDIT_USERNAME'],
-                password=required_vars['REDDIT_PASSWORD']
-            )
+            reddit = create_reddit(required_vars, stats=self.request_stats)
             
             # Test the connection
             user = reddit.user.me()
@@ -116,25 +118,187 @@ class RedditBot:
                 
             sys.exit(1)
             
-    def load_commented_posts(self) -> set:
-        """Load the list of posts we've already commented on."""
+    def load_commented_posts(self) -> dict:
+        """Load the posts we've already commented on, keyed by post id with the comment time."""
         try:
             with open('commented_posts.json', 'r') as f:
-                return set(json.load(f))
+                data = json.load(f)
+                
+            # Older versions stored a plain list of post ids
+            if isinstance(data, list):
+                now = time.time()
+                return {str(post_id): now for post_id in data}
+                
+            posts = {str(post_id): float(commented_utc) for post_id, commented_utc in data['posts'].items()}
+            synced_utc = data.get('synced_utc')
+            horizon_hours = data.get('horizon_hours')
+            self.history_synced_utc = float(synced_utc) if synced_utc is not None else None
+            self.history_horizon_hours = float(horizon_hours) if horizon_hours is not None else None
+            return posts
         except FileNotFoundError:
-            return set()
+            return {}
         except Exception as e:
             self.logger.warning(f"Error loading commented posts: {e}")
-            return set()
+            self.history_synced_utc = None
+            self.history_horizon_hours = None
+            return {}
             
     def save_commented_posts(self):
-        """Save the list of posts we've commented on."""
+        """Save the posts we've commented on that are still young enough to matter."""
+        # Posts we commented on before the age cutoff are filtered out as too old anyway
+        horizon_hours = POST_SELECTION['max_age_hours']
+        cutoff = time.time() - horizon_hours * 3600
+        self.commented_posts = {
+            post_id: commented_utc for post_id, commented_utc in self.commented_posts.items()
+            if commented_utc >= cutoff
+        }
+        
+        # The saved list only covers the shorter of the synced and the pruned horizons
+        if self.history_horizon_hours is not None:
+            horizon_hours = min(horizon_hours, self.history_horizon_hours)
+            
         try:
             with open('commented_posts.json', 'w') as f:
-                json.dump(list(self.commented_posts), f)
+                json.dump({
+                    'synced_utc': self.history_synced_utc,
+                    'horizon_hours': horizon_hours,
+                    'posts': self.commented_posts
+                }, f)
         except Exception as e:
             self.logger.error(f"Error saving commented posts: {e}")
             
+    def sync_commented_posts(self) -> bool:
+        """Rebuild the commented posts list from the account's own recent comments."""
+        now = time.time()
+        horizon_hours = POST_SELECTION['max_age_hours']
+        cutoff = now - horizon_hours * 3600
+        
+        # Comments before the last sync are already known, unless the age window has grown
+        incremental = (
+            self.history_synced_utc is not None
+            and self.history_horizon_hours is not None
+            and self.history_horizon_hours >= horizon_hours
+        )
+        if incremental:
+            # Overlap with the last sync, since created_utc comes from Reddit's clock and not ours
+            cutoff = max(cutoff, self.history_synced_utc - COMMENT_HISTORY['sync_overlap_seconds'])
+            
+        try:
+            self.logger.info("🔄 Syncing commented posts from account history...")
+            added = 0
+            
+            # Newest first; praw pages through the listing 100 comments per request
+            for comment in self.reddit.user.me().comments.new(limit=None):
+                if comment.created_utc < cutoff:
+                    break
+                    
+                post_id = comment.link_id.split('_', 1)[1]
+                if post_id not in self.commented_posts:
+                    self.commented_posts[post_id] = comment.created_utc
+                    added += 1
+                    
+            self.history_synced_utc = now
+            self.history_horizon_hours = horizon_hours
+            self.save_commented_posts()
+            self.logger.info(f"✅ Comment history synced, {added} posts added ({len(self.commented_posts)} tracked)")
+            return True
+            
+        except Exception as e:
+            self.logger.warning(f"Error syncing comment history: {e}")
+            return False
+            
+    def load_rejected_posts(self) -> dict:
+        """Load cached rejections, dropping entries that are due for a re-check."""
+        try:
+            with open(REJECTION_CACHE['file'], 'r') as f:
+                rejected = json.load(f)
+                
+            # Rejections made under different filter settings may no longer hold
+            if rejected.get('settings') != self.get_filter_settings():
+                self.logger.info("🔄 Post filter settings changed, discarding cached rejections")
+                return {}
+                
+            now = time.time()
+            return {
+                post_id: {'reason': str(entry['reason']), 'recheck_after': float(entry['recheck_after'])}
+                for post_id, entry in rejected['posts'].items() if float(entry['recheck_after']) > now
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Error loading rejected posts: {e}")
+            return {}
+        
+    def save_rejected_posts(self):
+        """Save the cache of rejected posts along with the filter settings that produced it."""
+        try:
+            with open(REJECTION_CACHE['file'], 'w') as f:
+                json.dump({'settings': self.get_filter_settings(), 'posts': self.rejected_posts}, f)
+        except Exception as e:
+            self.logger.error(f"Error saving rejected posts: {e}")
+            
+    def get_filter_settings(self) -> dict:
+        """Get the settings that decide whether a post is rejected."""
+        return {
+            'avoid_own_posts': COMMENT_BEHAVIOR['avoid_own_posts'],
+            'max_age_hours': POST_SELECTION['max_age_hours'],
+            'min_score': POST_SELECTION['min_score'],
+            'max_comments': POST_SELECTION['max_comments'],
+            'skip_stickied': POST_SELECTION['skip_stickied'],
+        }
+        
+    def load_subreddit_yield(self) -> dict:
+        """Load the per-subreddit share of fetched posts that passed the filters."""
+        try:
+            with open(LISTING_SIZE['file'], 'r') as f:
+                data = json.load(f)
+            return {str(name): float(value) for name, value in data.items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Error loading subreddit yield: {e}")
+            return {}
+            
+    def save_subreddit_yield(self):
+        """Save the per-subreddit yield history."""
+        try:
+            with open(LISTING_SIZE['file'], 'w') as f:
+                json.dump(self.subreddit_yield, f)
+        except Exception as e:
+            self.logger.error(f"Error saving subreddit yield: {e}")
+            
+    def update_subreddit_yield(self, subreddit_name: str, fetched: int, suitable: int):
+        """Fold the latest fetch into the subreddit's decayed moving average yield."""
+        if fetched == 0:
+            return
+            
+        observed = suitable / fetched
+        previous = self.subreddit_yield.get(subreddit_name)
+        if previous is None:
+            self.subreddit_yield[subreddit_name] = observed
+        else:
+            decay = LISTING_SIZE['decay']
+            self.subreddit_yield[subreddit_name] = decay * observed + (1 - decay) * previous
+            
+    def get_listing_limit(self, subreddit_name: str, needed: int) -> int:
+        """Size a listing request so it should contain the needed number of suitable posts."""
+        expected_yield = self.subreddit_yield.get(subreddit_name)
+        if expected_yield is None:
+            return LISTING_SIZE['default_limit']
+        return self.size_listing(needed, expected_yield)
+        
+    def size_listing(self, needed: int, expected_yield: float) -> int:
+        """Get the listing size expected to hold the needed posts at the given yield, with headroom."""
+        if expected_yield <= 0:
+            return LISTING_SIZE['max_limit']
+            
+        limit = math.ceil(needed * LISTING_SIZE['headroom'] / expected_yield)
+        return max(LISTING_SIZE['min_limit'], min(LISTING_SIZE['max_limit'], limit))
+        
+    def get_max_comments_per_subreddit(self) -> int:
+        """Get the maximum number of comments to post in each subreddit per run."""
+        return int(os.getenv('MAX_COMMENTS_PER_SUBREDDIT', 5))
+        
     def get_comment_text(self) -> str:
         """Get a random comment from templates or file."""
         try:
@@ -148,65 +312,156 @@ class RedditBot:
             self.logger.error(f"Error getting comment text: {e}")
             return random.choice(COMMENT_TEMPLATES)
             
+    def get_rejection_reason(self, post) -> Optional[str]:
+        """Return why a post is unsuitable for commenting, or None if it is suitable."""
+        # Skip our own posts
+        if COMMENT_BEHAVIOR['avoid_own_posts'] and post.author == self.reddit.user.me():
+            return 'own_post'
+            
+        # Skip posts we've already commented on
+        if COMMENT_BEHAVIOR['avoid_already_commented'] and post.id in self.commented_posts:
+            return 'already_commented'
+            
+        # Check post age
+        post_age = datetime.now() - datetime.fromtimestamp(post.created_utc)
+        if post_age > timedelta(hours=POST_SELECTION['max_age_hours']):
+            return 'too_old'
+            
+        # Check post score
+        if post.score < POST_SELECTION['min_score']:
+            return 'low_score'
+            
+        # Check number of comments
+        if post.num_comments > POST_SELECTION['max_comments']:
+            return 'too_many_comments'
+            
+        # Skip stickied posts
+        if POST_SELECTION['skip_stickied'] and post.stickied:
+            return 'stickied'
+            
+        return None
+        
     def is_post_suitable(self, post) -> bool:
         """Check if a post is suitable for commenting."""
         try:
-            # Skip our own posts
-            if COMMENT_BEHAVIOR['avoid_own_posts'] and post.author == self.reddit.user.me():
-                return False
-                
-            # Skip posts we've already commented on
-            if COMMENT_BEHAVIOR['avoid_already_commented'] and post.id in self.commented_posts:
-                return False
-                
-            # Check post age
-            post_age = datetime.now() - datetime.fromtimestamp(post.created_utc)
-            if post_age > timedelta(hours=POST_SELECTION['max_age_hours']):
-                return False
-                
-            # Check post score
-            if post.score < POST_SELECTION['min_score']:
+            # Skip known rejects until their re-check time
+            cached = self.rejected_posts.get(post.id)
+            if cached and cached['recheck_after'] > time.time():
+                self.logger.debug(f"Skipping cached reject {post.id} ({cached['reason']})")
                 return False
                 
-            # Check number of comments
-            if post.num_comments > POST_SELECTION['max_comments']:
-                return False
-                
-            # Skip stickied posts
-            if POST_SELECTION['skip_stickied'] and post.stickied:
-                return False
+            reason = self.get_rejection_reason(post)
+            if reason is None:
+                return True
                 
-            return True
+            recheck_hours = REJECTION_CACHE['recheck_hours'].get(reason)
+            if recheck_hours:
+                self.rejected_posts[post.id] = {
+                    'reason': reason,
+                    'recheck_after': time.time() + recheck_hours * 3600
+                }
+            return False
             
         except Exception as e:
             self.logger.error(f"Error checking post suitability: {e}")
             return False
             
-    def get_posts_from_subreddit(self, subreddit_name: str, limit: int = 25):
+    def get_listing(self, subreddit, limit: int, after: Optional[str] = None):
+        """Get the configured listing for a subreddit (or a combined a+b+c subreddit)."""
+        kwargs = {'limit': limit}
+        if after:
+            kwargs['params'] = {'after': after}
+            
+        if POST_SELECTION['sort_by'] == 'hot':
+            return subreddit.hot(**kwargs)
+        elif POST_SELECTION['sort_by'] == 'new':
+            return subreddit.new(**kwargs)
+        elif POST_SELECTION['sort_by'] == 'rising':
+            return subreddit.rising(**kwargs)
+        elif POST_SELECTION['sort_by'] == 'top':
+            return subreddit.top(
+                time_filter=POST_SELECTION['time_filter'], 
+                **kwargs
+            )
+        else:
+            return subreddit.hot(**kwargs)
+            
+    def get_posts_from_subreddit(self, subreddit_name: str, limit: Optional[int] = None):
         """Get posts from a specific subreddit."""
         try:
+            needed = self.get_max_comments_per_subreddit()
+            if limit is None:
+                limit = self.get_listing_limit(subreddit_name, needed)
+                
             subreddit = self.reddit.subreddit(subreddit_name)
+            suitable_posts = []
+            fetched = 0
+            fresh_fetched = 0
+            fresh_suitable = 0
+            after = None
             
-            if POST_SELECTION['sort_by'] == 'hot':
-                posts = subreddit.hot(limit=limit)
-            elif POST_SELECTION['sort_by'] == 'new':
-                posts = subreddit.new(limit=limit)
-            elif POST_SELECTION['sort_by'] == 'rising':
-                posts = subreddit.rising(limit=limit)
-            elif POST_SELECTION['sort_by'] == 'top':
-                posts = subreddit.top(
-                    time_filter=POST_SELECTION['time_filter'], 
-                    limit=limit
-                )
-            else:
-                posts = subreddit.hot(limit=limit)
+            # Fetch one more page if the first one comes back short of candidates
+            for page in range(2):
+                posts = list(self.get_listing(subreddit, limit, after=after))
+                fetched += len(posts)
+                
+                for post in posts:
+                    # Posts we already know about say nothing about the subreddit's yield
+                    known = post.id in self.commented_posts or post.id in self.rejected_posts
+                    suitable = self.is_post_suitable(post)
+                    if suitable:
+                        suitable_posts.append(post)
+                    if not known:
+                        fresh_fetched += 1
+                        fresh_suitable += suitable
+                        
+                if len(suitable_posts) >= needed or len(posts) < limit:
+                    break
+                    
+                # Size the next page from what this fetch actually returned, already-known posts included
+                after = posts[-1].fullname
+                limit = self.size_listing(needed - len(suitable_posts), len(suitable_posts) / fetched)
                 
-            return [post for post in posts if self.is_post_suitable(post)]
+            self.update_subreddit_yield(subreddit_name, fresh_fetched, fresh_suitable)
+            return suitable_posts
             
         except Exception as e:
             self.logger.error(f"Error getting posts from r/{subreddit_name}: {e}")
             return []
             
+    def get_posts_from_subreddits(self, subreddit_names: List[str], limit: Optional[int] = None) -> Optional[Dict[str, list]]:
+        """Get posts from several subreddits using one combined r/a+b+c listing.
+        
+        Posts are grouped back by subreddit. Returns None if the listing fails.
+        """
+        # Subreddit names are case-insensitive; keep the configured spelling as the key
+        names_by_key = {name.lower(): name for name in subreddit_names}
+        posts_by_subreddit = {name: [] for name in subreddit_names}
+        
+        # The merged ranking says nothing about a subreddit's own yield, so the combined
+        # listing uses a fixed share per subreddit; adaptive sizing applies to the top-ups
+        if limit is None:
+            limit = LISTING_SIZE['default_limit']
+        total_limit = min(
+            limit * len(subreddit_names),
+            LISTING_SIZE['max_limit'] * LISTING_SIZE['max_combined_pages']
+        )
+        
+        try:
+            subreddit = self.reddit.subreddit('+'.join(subreddit_names))
+            posts = self.get_listing(subreddit, total_limit)
+            
+            for post in posts:
+                name = names_by_key.get(post.subreddit.display_name.lower())
+                if name is not None and self.is_post_suitable(post):
+                    posts_by_subreddit[name].append(post)
+                    
+        except Exception as e:
+            self.logger.error(f"Error getting combined listing for {len(subreddit_names)} subreddits: {e}")
+            return None
+            
+        return posts_by_subreddit
+            
     def post_comment(self, post, comment_text: str) -> bool:
         """Post a comment on a Reddit post."""
         try:
@@ -220,7 +475,7 @@ class RedditBot:
             self.logger.info(f"✅ Posted comment on '{post.title[:50]}...' in r/{post.subreddit}")
             
             # Track this post
-            self.commented_posts.add(post.id)
+            self.commented_posts[post.id] = time.time()
             self.stats['comments_posted'] += 1
             
             return True
@@ -246,9 +501,28 @@ class RedditBot:
         if self.dry_run:
             self.logger.info("🧪 Running in DRY RUN mode - no comments will be posted")
             
+        if COMMENT_BEHAVIOR['avoid_already_commented'] and COMMENT_HISTORY['sync_on_start']:
+            # Without any successful sync we cannot tell which posts we already replied to
+            if not self.sync_commented_posts() and self.history_synced_utc is None:
+                self.logger.error("❌ Comment history unavailable and never synced - not commenting to avoid duplicate replies")
+                self.print_final_stats()
+                return
+            
         total_comments = 0
         max_total_comments = max_comments or len(TARGET_SUBREDDITS) * 5
         
+        fetch_mode = POST_SELECTION.get('fetch_mode', 'per_subreddit')
+        requests_at_start = self.request_stats.requests + self.request_stats.failures
+        top_ups = 0
+        
+        # Fetch candidates for every subreddit up front when using a combined listing
+        combined_posts = None
+        if fetch_mode == 'combined':
+            self.logger.info(f"📥 Fetching posts from {len(TARGET_SUBREDDITS)} subreddits in a combined listing...")
+            combined_posts = self.get_posts_from_subreddits(TARGET_SUBREDDITS)
+            if combined_posts is None:
+                self.logger.warning("⚠️  Combined listing failed, falling back to one request per subreddit")
+        
         for subreddit_name in TARGET_SUBREDDITS:
             if total_comments >= max_total_comments:
                 self.logger.info(f"🎯 Reached maximum comment limit ({max_total_comments})")
@@ -256,8 +530,21 @@ class RedditBot:
                 
             self.logger.info(f"🎯 Processing r/{subreddit_name}...")
             
+            max_per_sub = self.get_max_comments_per_subreddit()
+            
             # Get posts from subreddit
-            posts = self.get_posts_from_subreddit(subreddit_name)
+            if combined_posts is not None:
+                # Busy subreddits can crowd the rest out of the combined ranking, so top up
+                # from the subreddit's own listing when too few candidates are still valid
+                posts = [post for post in combined_posts[subreddit_name] if self.get_rejection_reason(post) is None]
+                if len(posts) < max_per_sub:
+                    top_ups += 1
+                    known_ids = {post.id for post in posts}
+                    posts.extend(
+                        post for post in self.get_posts_from_subreddit(subreddit_name) if post.id not in known_ids
+                    )
+            else:
+                posts = self.get_posts_from_subreddit(subreddit_name)
             
             if not posts:
                 self.logger.warning(f"⚠️  No suitable posts found in r/{subreddit_name}")
@@ -266,12 +553,19 @@ class RedditBot:
                 
             # Comment on posts
             subreddit_comments = 0
-            max_per_sub = int(os.getenv('MAX_COMMENTS_PER_SUBREDDIT', 5))
+            attempts = 0
             
-            for post in posts[:max_per_sub]:
-                if total_comments >= max_total_comments:
+            for post in posts:
+                if total_comments >= max_total_comments or attempts >= max_per_sub:
                     break
                     
+                # Candidates can be fetched long before we reach them; re-check age and duplicates
+                reason = self.get_rejection_reason(post)
+                if reason is not None:
+                    self.logger.debug(f"Skipping {post.id} on re-check ({reason})")
+                    continue
+                    
+                attempts += 1
                 comment_text = self.get_comment_text()
                 
                 if self.post_comment(post, comment_text):
@@ -294,8 +588,14 @@ class RedditBot:
             if subreddit_name != TARGET_SUBREDDITS[-1] and total_comments < max_total_comments:
                 self.wait_with_progress(RATE_LIMITS['subreddit_switch_delay'])
                 
+        requests_made = self.request_stats.requests + self.request_stats.failures - requests_at_start
+        self.logger.info(f"🌐 Fetch mode '{fetch_mode}': {requests_made} API requests this run"
+                         + (f" ({top_ups} subreddit top-ups)" if fetch_mode == 'combined' else ""))
+        
         # Save progress
         self.save_commented_posts()
+        self.save_rejected_posts()
+        self.save_subreddit_yield()
         self.print_final_stats()
         
     def print_final_stats(self):
@@ -308,6 +608,7 @@ class RedditBot:
         self.logger.info(f"   Errors: {self.stats['errors']}")
         self.logger.info(f"   Runtime: {runtime}")
         self.logger.info(f"   Subreddits Processed: {len(TARGET_SUBREDDITS)}")
+        self.logger.info(f"   API Requests: {self.request_stats.summary()}")
         
     def interactive_mode(self):
         """Run the bot in interactive mode."""
@@ -381,9 +682,13 @@ def main():
     except KeyboardInterrupt:
         print("\n👋 Bot stopped by user")
         bot.save_commented_posts()
+        bot.save_rejected_posts()
+        bot.save_subreddit_yield()
     except Exception as e:
         bot.logger.error(f"💥 Unexpected error: {e}")
         bot.save_commented_posts()
+        bot.save_rejected_posts()
+        bot.save_subreddit_yield()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Reddit Session Factory
+Builds praw clients on a shared, explicitly tuned HTTP session with request instrumentation.
+"""
+
+import time
+import logging
+from typing import Dict, Optional
+
+import praw
+import requests
+from prawcore import Requestor
+from requests.adapters import HTTPAdapter
+
+from config import NETWORK
+
+logger = logging.getLogger('RedditBot.http')
+
+class RequestStats:
+    """Aggregate latency, bytes transferred and status codes for Reddit API requests."""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.status_codes = {}
+
+    def record(self, latency: float, bytes_sent: int, bytes_received: int, bytes_decoded: int, status_code: int):
+        """Record a completed request; bytes_received is the wire size, bytes_decoded the body after gzip."""
+        self.requests += 1
+        self.total_latency += latency
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.bytes_decoded += bytes_decoded
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def record_failure(self, latency: float):
+        """Record a request that raised before returning a response."""
+        self.failures += 1
+        self.total_latency += latency
+
+    def summary(self) -> str:
+        """Return a one-line summary of the recorded requests."""
+        total = self.requests + self.failures
+        avg_latency = self.total_latency / total if total else 0.0
+        statuses = ', '.join(f"{code}: {count}" for code, count in sorted(self.status_codes.items()))
+        return (f"{total} requests, {self.failures} failed, avg {avg_latency * 1000:.0f} ms, "
+                f"{self.bytes_sent / 1024:.1f} KiB sent, {self.bytes_received / 1024:.1f} KiB received "
+                f"({self.bytes_decoded / 1024:.1f} KiB decoded) ({statuses or 'no responses'})")
+
+class InstrumentedRequestor(Requestor):
+    """prawcore Requestor that records latency, size and status of every request."""
+
+    def __init__(self, *args, stats: Optional[RequestStats] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats if stats is not None else RequestStats()
+
+    def request(self, method, url, *args, **kwargs):
+        """Issue the request and record its metrics."""
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            self.stats.record_failure(time.perf_counter() - start)
+            raise
+        latency = time.perf_counter() - start
+
+        body = response.request.body
+        bytes_sent = len(body.encode() if isinstance(body, str) else body or b'')
+        bytes_decoded = len(response.content)
+        # The raw urllib3 response counts the bytes read off the wire, before gzip decoding
+        bytes_received = response.raw.tell() if response.raw is not None else bytes_decoded
+        self.stats.record(latency, bytes_sent, bytes_received, bytes_decoded, response.status_code)
+        logger.debug(f"{method.upper()} {url} -> {response.status_code} in {latency * 1000:.0f} ms, "
+                     f"{bytes_sent} bytes sent, {bytes_received} bytes received")
+        return response
+
+def create_session() -> requests.Session:
+    """Create an HTTP session with explicit pooling, keep-alive and compression settings."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=NETWORK['pool_connections'],
+        pool_maxsize=NETWORK['pool_maxsize'],
+        max_retries=NETWORK['max_retries']
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+def create_reddit(credentials: Dict[str, str], stats: Optional[RequestStats] = None) -> praw.Reddit:
+    """Create a praw.Reddit client that sends all traffic through an instrumented shared session."""
+    return praw.Reddit(
+        client_id=credentials['REDDIT_CLIENT_ID'],
+        client_secret=credentials['REDDIT_CLIENT_SECRET'],
+        user_agent=credentials['REDDIT_USER_AGENT'],
+        username=credentials['REDDIT_USERNAME'],
+        password=credentials['REDDIT_PASSWORD'],
+        requestor_class=InstrumentedRequestor,
+        requestor_kwargs={
+            'session': create_session(),
+            'timeout': NETWORK['timeout'],
+            'stats': stats
+        }
+    )
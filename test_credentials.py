@@ -6,8 +6,8 @@ Test your Reddit API credentials before running the bot.
 
 import os
 import sys
-import praw
 from dotenv import load_dotenv
+from reddit_session import RequestStats, create_reddit
 
 def test_credentials():
     """Test Reddit API credentials step by step."""
@@ -58,13 +58,8 @@ def test_credentials():
     
     # Test Reddit connection
     try:
-        reddit = praw.Reddit(
-            client_id=credentials['REDDIT_CLIENT_ID'],
-            client_secret=credentials['REDDIT_CLIENT_SECRET'],
-            user_agent=credentials['REDDIT_USER_AGENT'],
-            username=credentials['REDDIT_USERNAME'],
-            password=credentials['REDDIT_PASSWORD']
-        )
+        stats = RequestStats()
+        reddit = create_reddit(credentials, stats=stats)
         
         # Test by getting user info
         user = reddit.user.me()
@@ -79,6 +74,7 @@ def test_credentials():
         except Exception as e:
             print(f"⚠️  Subreddit access warning: {e}")
         
+        print(f"🌐 Network: {stats.summary()}")
         return True
         
     except Exception as e:
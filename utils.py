@@ -35,18 +35,25 @@ def view_stats():
     # Check commented posts
     if os.path.exists('commented_posts.json'):
         with open('commented_posts.json', 'r') as f:
-            posts = json.load(f)
+            data = json.load(f)
+            posts = data if isinstance(data, list) else data.get('posts', {})
             print(f"💬 Posts commented on: {len(posts)}")
     else:
         print("💬 No commented posts recorded")
     
+    # Check rejected post cache
+    if os.path.exists('rejected_posts.json'):
+        with open('rejected_posts.json', 'r') as f:
+            rejected = json.load(f)
+            print(f"🚫 Cached rejected posts: {len(rejected.get('posts', {}))}")
+    
     print()
 
 def clear_history():
     """Clear bot history."""
     confirm = input("⚠️  Are you sure you want to clear all bot history? (yes/no): ")
     if confirm.lower() == 'yes':
-        files_to_remove = ['commented_posts.json', 'bot.log']
+        files_to_remove = ['commented_posts.json', 'rejected_posts.json', 'subreddit_yield.json', 'bot.log']
         for file in files_to_remove:
             if os.path.exists(file):
                 os.remove(file)
@@ -62,7 +69,7 @@ def backup_data():
     
     os.makedirs(backup_dir, exist_ok=True)
     
-    files_to_backup = ['commented_posts.json', 'bot.log', '.env', 'config.py']
+    files_to_backup = ['commented_posts.json', 'rejected_posts.json', 'subreddit_yield.json', 'bot.log', '.env', 'config.py']
     backed_up = 0
     
     for file in files_to_backup: